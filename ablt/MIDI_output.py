@@ -7,6 +7,7 @@ from mido import Message, MidiFile, MidiTrack, MetaMessage, bpm2tempo
 
 
 def create_MIDI_file(midi_array, BPM, title, output_dir, middle_c='C4', tpb=960*16):
+    """Writes the midi_array to output_dir/title.mid, output_dir should already exist."""
               
     outfile = MidiFile(ticks_per_beat=tpb)
     track = MidiTrack()
@@ -43,6 +44,5 @@ def create_MIDI_file(midi_array, BPM, title, output_dir, middle_c='C4', tpb=960*
 
     track.append(MetaMessage('end_of_track'))
 
-    os.makedirs(output_dir, exist_ok=True)  
     output_path = os.path.join(output_dir, '{}.mid'.format(title))
     outfile.save(output_path)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from .extract import extract_single_bass_line
+from .extract import extract_single_bass_line, extract_bass_lines, extract_bass_lines_batched
 from .extractor_class import BassLineExtractor
 from .parallel_processing import BatchBasslineExtractor, extract_batch_basslines
 from .parallel_processing import main as main_batch
\ No newline at end of file
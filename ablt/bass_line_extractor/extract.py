@@ -3,25 +3,59 @@
 
 import os
 import sys
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
 
 from .extractor_class import BassLineExtractor
-from ..utilities import exception_logger
+from .parallel_processing.batch_source_separator import separate_basslines
+from ..utilities import exception_logger, load_source_separation_model, compile_source_separation_model
 from ..directories import OUTPUT_DIR
 
+_separator = None # demucs model of a worker process, set by _init_worker
+
+MAX_WORKERS = 4 # default number of worker processes, each one holds its own demucs model in memory
+
 
 # TODO: track.track to track.audio ??
 def extract_single_bass_line(path, N_bars=4, separator=None, BPM=0):
     """
     Creates a Bass line_Extractor object for a track using the metadata provided. Extracts and Exports the Bass line.
+    Returns the chorus beat positions so that the transcription does not have to read them back, None on failure.
     """
 
+    extractor = extract_chorus(path, N_bars=N_bars, separator=separator, BPM=BPM)
+    if extractor is None:
+        return None
+
     try:
-        
-        print('\n'+path)
-        title = os.path.splitext(os.path.basename(path))[0]
+        # Extract the Bass Line from the Chorus 
+        extractor.source_separator.separate_bass_line(extractor.chorus_detector.chorus)
+    except KeyboardInterrupt:
+        sys.exit()
+    except Exception as ex:
+        log_extraction_exception(ex, extractor.info.title)
+        return None
+
+    return export_bass_line(extractor)
+
+
+def extract_chorus(path, N_bars=4, separator=None, BPM=0):
+    """
+    Creates a BassLineExtractor for a track, estimates its beats, chorus and BPM. Extracts and Exports the chorus.
+    Returns the extractor, None on failure.
+    """
+
+    print('\n'+path)
+    title = os.path.splitext(os.path.basename(path))[0]
+
+    # Check the file before creating the extractor and its directories, no traceback to format
+    if not os.path.isfile(path):
+        log_extraction_exception(FileNotFoundError('No such audio file: {}'.format(path)), title)
+        return None
 
-        # Directory to log exceptions
-        exception_dir = os.path.join(OUTPUT_DIR, "{}/exceptions/extraction".format(title))
+    try:
 
         # Create the extractor
         extractor = BassLineExtractor(path, N_bars=N_bars, separator=separator, BPM=BPM)
@@ -41,29 +75,143 @@ def extract_single_bass_line(path, N_bars=4, separator=None, BPM=0):
             extractor.beat_detector.export_BPM()
 
         # Extract the Chorus and Export 
-        chorus = extractor.chorus_detector.extract_chorus_array()
+        extractor.chorus_detector.extract_chorus_array()
         extractor.chorus_detector.export_chorus_array()
         extractor.chorus_detector.export_chorus_audio()
 
-        # Extract the Bass Line from the Chorus 
-        extractor.source_separator.separate_bass_line(chorus)   
+        return extractor
+
+    except KeyboardInterrupt:
+        sys.exit()
+    except Exception as ex:
+        log_extraction_exception(ex, title)
+
+
+def export_bass_line(extractor):
+    """
+    Processes and Exports the separated Bass line of an extractor.
+    Returns the chorus beat positions, None on failure.
+    """
+
+    try:
         extractor.source_separator.process_bass_line()
 
         # Export the Bass Line
         extractor.source_separator.export_bass_line_array()
         extractor.source_separator.export_bass_line_audio()      
 
+        return extractor.chorus_detector.chorus_beat_positions
+
     except KeyboardInterrupt:
         sys.exit()
-    except KeyError as key_ex:
-        print('Key Error on: {}'.format(title))
-        exception_logger(exception_dir, key_ex, title)
-    except FileNotFoundError as file_ex:
-        print('FileNotFoundError on: {}'.format(title))
-        exception_logger(exception_dir, file_ex, title)
-    except RuntimeError as runtime_ex:
-        print('RuntimeError on: {}'.format(title))
-        exception_logger(exception_dir, runtime_ex, title)
-    except Exception as ex:     
+    except Exception as ex:
+        log_extraction_exception(ex, extractor.info.title)
+
+
+def log_extraction_exception(ex, title):
+    """Prints and logs an exception raised during the extraction of a track."""
+
+    if isinstance(ex, (KeyError, FileNotFoundError, RuntimeError)):
+        print('{} on: {}'.format(type(ex).__name__, title))
+    else:
         print("There was an unexpected error on: {}".format(title))
-        exception_logger(exception_dir, ex, title)
\ No newline at end of file
+
+    # Directory to log exceptions
+    exception_dir = os.path.join(OUTPUT_DIR, "{}/exceptions/extraction".format(title))
+    exception_logger(exception_dir, ex, title)
+
+
+def extract_bass_lines_batched(paths, BPMs, N_bars=4, separator=None, batch_size=8, compile_model=False):
+    """
+    Extracts the bass lines of multiple tracks, separating the choruses of batch_size tracks together.
+    The beats and the choruses of a batch are estimated first, then the choruses are separated
+    with separate_basslines, which gives the same bass lines as extract_single_bass_line.
+
+        Parameters:
+        -----------
+            paths (list): paths of the tracks
+            BPMs (list): BPM value of each track, 0 for estimating it
+            N_bars (int, default=4): Number of bars of bass line to extract
+            separator (default=None): demucs Source Separator, loaded if None
+            batch_size (int, default=8): number of tracks whose choruses are separated together
+            compile_model (bool, default=False): compile the separator with torch.compile (torch >= 2.0),
+                                                each new chorus length pays the compilation once
+
+        Returns:
+        --------
+            chorus_beat_positions (list): chorus beat positions of each track, None where it failed
+    """
+
+    from torch import cuda
+
+    if separator is None:
+        separator = load_source_separation_model()
+    device = 'cuda' if cuda.is_available() else 'cpu'
+    separator = separator.to(device)
+    if compile_model:
+        separator = compile_source_separation_model(separator)
+
+    chorus_beat_positions = []
+    for i in tqdm(range(0, len(paths), batch_size)):
+
+        extractors = [extract_chorus(path, N_bars=N_bars, separator=separator, BPM=BPM)
+                        for path, BPM in zip(paths[i:i+batch_size], BPMs[i:i+batch_size])]
+        batch = [(j, extractor) for j, extractor in enumerate(extractors) if extractor is not None]
+
+        # Keep only the choruses of the batch in memory, not the whole tracks
+        for _, extractor in batch:
+            extractor.chorus_detector.chorus = extractor.chorus_detector.chorus.copy()
+            extractor.chorus_detector.track = extractor.track = None
+
+        batch_chorus_beat_positions = [None]*len(extractors)
+        try:
+            separated_bass_lines = separate_basslines([extractor.chorus_detector.chorus for _, extractor in batch],
+                                                        separator, device, batch_size)
+        except KeyboardInterrupt:
+            sys.exit()
+        except Exception as ex:
+            for _, extractor in batch:
+                log_extraction_exception(ex, extractor.info.title)
+        else:
+            for (j, extractor), separated_bass_line in zip(batch, separated_bass_lines):
+                extractor.source_separator.separated_bass_line = separated_bass_line
+                batch_chorus_beat_positions[j] = export_bass_line(extractor)
+
+        chorus_beat_positions += batch_chorus_beat_positions
+
+    return chorus_beat_positions
+
+
+def _init_worker(n_threads):
+    """Loads the source separator once per worker process, torch models do not pickle across processes."""
+    from torch import set_num_threads
+    global _separator
+    set_num_threads(n_threads) # share the cores between the workers
+    _separator = load_source_separation_model()
+
+
+def _extract_in_worker(path, BPM, N_bars=4):
+    extract_single_bass_line(path, N_bars=N_bars, separator=_separator, BPM=BPM)
+
+
+def extract_bass_lines(paths, BPMs, N_bars=4, max_workers=None):
+    """
+    Extracts the bass lines of multiple tracks in parallel, each worker process handles one track at a time.
+
+        Parameters:
+        -----------
+            paths (list): paths of the tracks
+            BPMs (list): BPM value of each track, 0 for estimating it
+            N_bars (int, default=4): Number of bars of bass line to extract
+            max_workers (int, default=None): number of worker processes, None for min(MAX_WORKERS, cpu count).
+                                            Each worker loads its own demucs_extra, so the memory use grows
+                                            with the number of workers.
+    """
+
+    if max_workers is None:
+        max_workers = min(MAX_WORKERS, os.cpu_count())
+    n_threads = max(1, os.cpu_count() // max_workers)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(n_threads,)) as executor:
+        for _ in tqdm(executor.map(partial(_extract_in_worker, N_bars=N_bars), paths, BPMs), total=len(paths)):
+            pass
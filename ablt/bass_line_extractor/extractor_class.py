@@ -7,20 +7,12 @@ import warnings
 import numpy as np
 from scipy.io.wavfile import write
 
-from torch import tensor
 from librosa import load 
 from librosa.util import normalize
 
-# High Level Audio Processing
-from madmom.features.beats import RNNBeatProcessor, BeatTrackingProcessor # Beat Tracking
-from madmom.processors import SequentialProcessor
-
-from demucs.utils import apply_model
-from demucs.pretrained import load_pretrained
-
 from .chorus_estimation import drop_detection, check_chorus_beat_grid
 from ..signal_processing import lp_and_normalize
-from ..utilities import export_function
+from ..utilities import export_function, load_beat_tracking_processor, load_source_separation_model
 
 from ..constants import FS, CUTOFF_FREQ
 from ..directories import OUTPUT_DIR
@@ -109,7 +101,7 @@ class BeatDetector:
     def __init__(self, info):
 
         self.info = info
-        self.processor = SequentialProcessor([RNNBeatProcessor(), BeatTrackingProcessor(fps=100)])
+        self.processor = load_beat_tracking_processor()
           
     def estimate_beat_positions(self, track):
         """
@@ -225,12 +217,11 @@ class SourceSeparator:
             Parameters:
             -----------
                 info (Info): Info class instance of the track.
-                separator (default=None): provide a Source separator or load demucs_extra pretrained. 
+                separator (default=None): provide a Source separator or load demucs_extra pretrained
+                                        when the first bass line is separated.
         """
         
         self.info = info
-        if separator is None:
-            separator = load_pretrained('demucs_extra')
         self.separator = separator
 
     def separate_bass_line(self, chorus):
@@ -244,8 +235,14 @@ class SourceSeparator:
         source_names = ["drums", "bass", "other", "vocals"]
         """
         
+        from torch import tensor
+        from demucs.utils import apply_model
+
         print('Separating the Bass Line.') 
 
+        if self.separator is None:
+            self.separator = load_source_separation_model()
+
         # For demucs implementation
         wav = np.stack([chorus]*2, axis=0)
         ref = wav.mean(0)
@@ -1,17 +1,14 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+from itertools import repeat
 from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-from torch import tensor
 
 from librosa.util import normalize
 
-from demucs.utils import apply_model # Source Separation
-from demucs.pretrained import load_pretrained
-
-from ...utilities import batch_export_function
+from ...utilities import batch_export_function, load_source_separation_model
 from ...signal_processing import lp_and_normalize
 
 class BatchSourceSeparator:
@@ -19,7 +16,7 @@ class BatchSourceSeparator:
     SourceSeparator class. Separates the bassline from a given chorus array and processes it.
     """
     
-    def __init__(self, info, separator=None, max_workers=None):
+    def __init__(self, info, separator=None, max_workers=None, batch_size=8):
         """
             Parameters:
             -----------
@@ -27,23 +24,29 @@ class BatchSourceSeparator:
                 separator (default=None): provide a Source separator or load demucs_extra pretrained.
                 max_workers (int, default=None): number of workers for multithreading, give None for
                                                         letting the computer decide.
+                batch_size (int, default=8): number of choruses to separate in a single forward pass
         """
         
+        from torch import cuda
+
         self.info = info
         if separator is None:
-            separator = load_pretrained('demucs_extra')
-        self.separator = separator
+            separator = load_source_separation_model()
+        self.device = 'cuda' if cuda.is_available() else 'cpu'
+        self.separator = separator.to(self.device)
         self.max_workers=max_workers
+        self.batch_size = batch_size
     
     def separate_basslines(self, chorus_dict):
         print('Separating Basslines...')
-        
-        bassline_dict = {}
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor: 
 
-            for title, chorus in chorus_dict.items():
-                future = executor.submit(separate_single_bassline, chorus, self.separator, self.info.fs)
-                bassline_dict[title] = future.result()
+        titles = list(chorus_dict)
+        separated_basslines = separate_basslines([chorus_dict[title] for title in titles], self.separator,
+                                                self.device, self.batch_size)
+
+        # post process the basslines in parallel
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor: 
+            bassline_dict = dict(zip(titles, executor.map(process_bassline, separated_basslines, repeat(self.info.fs))))
         
         self.bassline_dict = bassline_dict
         print('Done. (Separation)')
@@ -54,34 +57,99 @@ class BatchSourceSeparator:
         del self.bassline_dict
 
 
-def separate_single_bassline(chorus, separator, fs):
+def separate_basslines(choruses, separator, device='cpu', batch_size=8):
+    """
+    Separates the basslines of multiple choruses, batching the choruses that demucs pads to the same length.
+    Gives the same basslines as separating them one by one with apply_model(split=True, overlap=0.25).
+    Choruses longer than a split stride are chunked by apply_model, so they are separated one by one.
+
+        Parameters:
+        -----------
+            choruses (list): list of chorus arrays
+            separator: demucs Source Separator, already on the device
+            device (str, default='cpu'): device of the separator
+            batch_size (int, default=8): maximum number of choruses in a forward pass
+
+        Returns:
+        --------
+            separated_basslines (list): stereo bassline array of each chorus, in the order of choruses
+    """
+
+    from demucs.utils import apply_model
+
+    stride = int(0.75*separator.segment_length) # stride of apply_model(split=True, overlap=0.25)
+
+    separated_basslines = [None]*len(choruses)
+    groups = {}
+    for i, chorus in enumerate(choruses):
+        if len(chorus) > stride:
+            chorus, mean, std = preprocess_chorus(chorus)
+            sources = apply_model(separator, chorus.to(device), shifts=0, split=True, overlap=0.25, progress=False)
+            separated_basslines[i] = sources[1].cpu().numpy()*std + mean
+        else:
+            # a single chunk is padded to the valid length and the LSTM sees the padding too
+            groups.setdefault(separator.valid_length(len(chorus)), []).append(i)
+
+    for indices in groups.values():
+        for j in range(0, len(indices), batch_size):
+            batch_indices = indices[j:j+batch_size]
+            batch = separate_bassline_batch([choruses[i] for i in batch_indices], separator, device)
+            for i, bassline in zip(batch_indices, batch):
+                separated_basslines[i] = bassline
+
+    return separated_basslines
+
+
+def separate_bassline_batch(choruses, separator, device='cpu'):
     """
-    Separates the bassline from a given chorus array.
+    Separates the basslines of multiple choruses with a single forward pass of the separator.
+    Each bassline is the one apply_model gives without splitting if the choruses share separator.valid_length.
 
         Parameters:
         -----------
-            chorus (ndarray): chorus array
+            choruses (list): list of chorus arrays
+            separator: demucs Source Separator
+            device (str, default='cpu'): device of the separator
 
-    source_names = ["drums", "bass", "other", "vocals"]
+        Returns:
+        --------
+            separated_basslines (list): stereo bassline array of each chorus
     """
 
-    chorus, mean, std = preprocess_chorus(chorus)
+    from torch import zeros, no_grad
+    from demucs.utils import center_trim
 
-    sources = apply_model(separator, chorus,
-                        shifts=0, split=True,
-                        overlap=0.25, progress=False)
+    lengths = [len(chorus) for chorus in choruses]
+    valid_length = separator.valid_length(max(lengths))
 
-    sources = sources*std + mean
+    # Center each chorus inside a zero padded batch, as demucs.apply_model does for a single track
+    batch = zeros(len(choruses), 2, valid_length)
+    means, stds = [], []
+    for i, chorus in enumerate(choruses):
+        chorus, mean, std = preprocess_chorus(chorus)
+        offset = (valid_length - lengths[i]) // 2
+        batch[i, :, offset:offset+lengths[i]] = chorus
+        means.append(mean)
+        stds.append(std)
 
-    separated_bassline = sources[1,:,:].numpy()
+    if device == 'cuda':
+        batch = batch.pin_memory()
 
-    processed_bassline = process_bassline(separated_bassline, fs)
-    
-    return processed_bassline
+    with no_grad():
+        sources = separator(batch.to(device, non_blocking=True)).cpu()
+
+    separated_basslines = []
+    for i, length in enumerate(lengths):
+        bassline = center_trim(sources[i, 1], length).numpy()
+        separated_basslines.append(bassline*stds[i] + means[i])
+
+    return separated_basslines
       
         
 def preprocess_chorus(chorus, audio_channels=2):
 
+    from torch import tensor
+
     if audio_channels == 2:
         chorus = np.stack([chorus]*2, axis=0)            
     ref = chorus.mean(0)
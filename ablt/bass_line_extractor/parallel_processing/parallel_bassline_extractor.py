@@ -7,11 +7,9 @@ import gc
 import numpy as np
 from tqdm import tqdm
 
-from demucs.pretrained import load_pretrained
-
 from .parallel_extractor_classes import BatchBasslineExtractor
 
-from ...utilities import exception_logger
+from ...utilities import exception_logger, load_source_separation_model
 
 DIRECTORIES_JSON_PATH = 'data/directories.json'
 
@@ -60,25 +58,19 @@ def extract_batch_basslines(titles, directories, date, fs=44100, N_bars=4, separ
     except KeyboardInterrupt:
         sys.exit()
         pass
-    except KeyError as key_ex:
-        print('\nKey Error inside batch. Check the exception log for more detail.')
-        exception_logger(directories['extraction'], key_ex, date, '\n'.join(titles))
-    except FileNotFoundError as file_ex:
-        print('\nFileNotFoundError inside batch. Check the exception log for more detail.')
-        exception_logger(directories['extraction'], file_ex, date, '\n'.join(titles))
-    except RuntimeError as runtime_ex:
-        print('\nRuntimeError inside batch. Check the exception log for more detail.')
-        exception_logger(directories['extraction'], runtime_ex, date, '\n'.join(titles))
+    except (KeyError, FileNotFoundError, RuntimeError) as ex:
+        print('\n{} inside batch. Check the exception log for more detail.'.format(type(ex).__name__))
+        exception_logger(directories['extraction'], ex, '\n'.join(titles))
     except Exception as ex:     
         print("\nThere was an unexpected error inside batch. Check the exception log for more detail.")
-        exception_logger(directories['extraction'], ex, date, '\n'.join(titles)) 
+        exception_logger(directories['extraction'], ex, '\n'.join(titles))
 
 
 def main(track_dicts_name, batch_size=6, thread_workers='auto', process_workers='auto'):
     
     directories, _, track_dicts, track_titles, date = prepare(DIRECTORIES_JSON_PATH, track_dicts_name)
 
-    separator = load_pretrained('demucs_extra') # load demucs once at the beginning
+    separator = load_source_separation_model() # load demucs once at the beginning
 
     N_batches = len(track_titles) // batch_size
 
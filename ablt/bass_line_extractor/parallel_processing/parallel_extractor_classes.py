@@ -8,12 +8,8 @@ from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from librosa import load 
 
-# High Level Audio Processing
-from madmom.features.beats import RNNBeatProcessor, BeatTrackingProcessor # Beat Tracking
-from madmom.processors import SequentialProcessor
-
 from ..chorus_estimation import drop_detection, check_chorus_beat_grid
-from ...utilities import export_function, batch_export_function
+from ...utilities import export_function, batch_export_function, load_beat_tracking_processor
 
 from .parallel_madmom import process_batch
 from .batch_source_separator import BatchSourceSeparator
@@ -123,7 +119,7 @@ class BatchTracks:
                 except FileNotFoundError:
                     print('Track not Found: {}\nMoving to the next track.\n'.format(title))
                 except Exception as ex:
-                    print(''.join(traceback.format_exception(etype=type(ex), value=ex, tb=ex.__traceback__)))
+                    print(''.join(traceback.TracebackException.from_exception(ex).format()))
 
         print('Done. (Loading)\n')
         return track_array_dict
@@ -138,7 +134,7 @@ class BatchBeatDetector:
 
         self.info = info
         self.max_workers = max_workers
-        self.processor = SequentialProcessor([RNNBeatProcessor(), BeatTrackingProcessor(fps=100)])
+        self.processor = load_beat_tracking_processor()
           
     def estimate_beat_positions(self, track_array_dict):
         """
@@ -11,7 +11,7 @@ from ..directories import OUTPUT_DIR
 
 def transcribe_single_bass_line(path, BPM, M=M, N_bars=4, hop_ratio=HOP_RATIO,
                                 quantization_scheme='adaptive', epsilon=2,
-                                pYIN_threshold=PYIN_THRESHOLD):
+                                pYIN_threshold=PYIN_THRESHOLD, chorus_beat_positions=None):
     """
         Parameters:
         -----------
@@ -23,6 +23,7 @@ def transcribe_single_bass_line(path, BPM, M=M, N_bars=4, hop_ratio=HOP_RATIO,
             quantization_scheme (str, default=adaptive): F0 quantization scheme
             epsilon (int): freq_bound = delta_scale/epsilon determines if quantization will happen.
             pYIN_threshold (float): Confidence level threshold for F0 estimation filtering.
+            chorus_beat_positions (ndarray, default=None): Chorus beat positions, read from the disk if None
 
     """
 
@@ -34,7 +35,8 @@ def transcribe_single_bass_line(path, BPM, M=M, N_bars=4, hop_ratio=HOP_RATIO,
         # Directory to log exceptions
         exception_dir = os.path.join(OUTPUT_DIR, "{}/exceptions/transciption".format(title))
 
-        bass_line_transcriber = BassLineTranscriber(path, BPM, M=M, N_bars=N_bars, hop_ratio=hop_ratio)
+        bass_line_transcriber = BassLineTranscriber(path, BPM, M=M, N_bars=N_bars, hop_ratio=hop_ratio,
+                                                    chorus_beat_positions=chorus_beat_positions)
 
         # Pitch Track Extraction
         bass_line_transcriber.extract_pitch_track(pYIN_threshold)
@@ -44,9 +46,7 @@ def transcribe_single_bass_line(path, BPM, M=M, N_bars=4, hop_ratio=HOP_RATIO,
         bass_line_transcriber.create_MIDI_sequence()
 
         # Exporting
-        bass_line_transcriber.export_F0_estimate()
-        bass_line_transcriber.export_pitch_track()
-        bass_line_transcriber.export_quantized_pitch_track()
+        bass_line_transcriber.export_pitch_tracks()
 
         # MIDI reconstruction
         bass_line_transcriber.export_MIDI_file()        
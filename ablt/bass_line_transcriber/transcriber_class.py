@@ -2,13 +2,14 @@
 # coding: utf-8
 
 import os
+from functools import cached_property
 
 import numpy as np
 
 from .transcription import (pYIN_F0, adaptive_voiced_region_quantization,
-                            uniform_voiced_region_quantization, midi_sequence_to_midi_array,
+                            uniform_voiced_region_quantization, midi_sequence_to_midi_arrays,
                             frequency_to_midi_sequence)
-from ..utilities import (get_chorus_beat_positions, get_quarter_beat_positions, export_function)
+from ..utilities import get_chorus_beat_positions, get_quarter_beat_positions
 from ..MIDI_output import create_MIDI_file
 from ..directories import OUTPUT_DIR
 from ..constants import HOP_RATIO, M
@@ -16,7 +17,8 @@ from ..constants import HOP_RATIO, M
 
 class BassLineTranscriber():
 
-    def __init__(self, bass_line_path, BPM, M=M, N_bars=4, hop_ratio=HOP_RATIO, silence_code=0):
+    def __init__(self, bass_line_path, BPM, M=M, N_bars=4, hop_ratio=HOP_RATIO, silence_code=0,
+                chorus_beat_positions=None):
         """
         BassLineTranscriber object for transcribing a chorus bassline.
 
@@ -29,6 +31,8 @@ class BassLineTranscriber():
                 N_bars (int, default=4): Number of bars to perform transcription on
                 hop_ratio (int, default=32): Number of F0 estimate samples that make up a beat
                 silence_code (int, default=0): code integer to represent silent regions
+                chorus_beat_positions (ndarray, default=None): beat positions of the chorus if they are
+                                                            already in memory, loaded from the disk if None
         
         """
 
@@ -43,20 +47,25 @@ class BassLineTranscriber():
         self.hop_ratio = hop_ratio # Determines the hop size w.r.t a beat
         self.N_qb = hop_ratio // 4 # number of F0 samples corresponding to a quarter beat
 
-        # Output Directories
+        # Output Directory, the sub directories are formed when they are first used
         self.output_dir = os.path.join(OUTPUT_DIR, self.title)
-        self.F0_estimate_dir = os.path.join(self.output_dir, 'F0_estimate')
-        self.pitch_track_dir = os.path.join(self.output_dir, 'pitch_track')
-        self.quantized_pitch_track_dir = os.path.join(self.output_dir, "quantized_pitch_track")
-        self.midi_dir = os.path.join(self.output_dir, 'midi')          
-        
-        chorus_beat_positions = get_chorus_beat_positions(self.output_dir) # return 4*N_bars worth of beats
+
+        if chorus_beat_positions is None:
+            chorus_beat_positions = get_chorus_beat_positions(self.output_dir) # return 4*N_bars worth of beats
         self.quarter_beat_positions = get_quarter_beat_positions(chorus_beat_positions)
 
-        self.bass_line = np.load(bass_line_path)
+        self.bass_line = np.load(bass_line_path, mmap_mode='r') # read-only, pYIN copies what it frames
 
         self.silence_code = silence_code
 
+    @cached_property
+    def pitch_tracks_dir(self):
+        return os.path.join(self.output_dir, 'pitch_tracks')
+
+    @cached_property
+    def midi_dir(self):
+        return os.path.join(self.output_dir, 'midi')
+
     def extract_pitch_track(self, pYIN_threshold=0.05):
 
         print('Starting the transcription process.')
@@ -86,21 +95,26 @@ class BassLineTranscriber():
     def export_MIDI_file(self):
 
         print('Creating the MIDI file.')
-        for m in self.M:
-            # Downsample by m and convert to a MIDI file
-            bass_line_midi_array = midi_sequence_to_midi_array(self.midi_sequence,
-                                                                M=m,
-                                                                N_qb=self.N_qb,
-                                                                silence_code=self.silence_code)                                                                                                                           
-            midi_dir = os.path.join(self.midi_dir, str(m))                                                    
-            create_MIDI_file(bass_line_midi_array, self.BPM, self.title, midi_dir)        
-
-    def export_F0_estimate(self):
-        print('Exporting the F0 estimate.')
-        export_function(self.F0_estimate, self.F0_estimate_dir, self.title)
-
-    def export_pitch_track(self):
-        export_function(self.pitch_track, self.pitch_track_dir, self.title)
-
-    def export_quantized_pitch_track(self):
-        export_function(self.pitch_track_quantized, self.quantized_pitch_track_dir, self.title)
\ No newline at end of file
+
+        # Downsample by each m and convert to MIDI arrays
+        bass_line_midi_arrays = midi_sequence_to_midi_arrays(self.midi_sequence,
+                                                            M=self.M,
+                                                            N_qb=self.N_qb,
+                                                            silence_code=self.silence_code)
+
+        # Create the directory of each m before writing
+        midi_dirs = {m: os.path.join(self.midi_dir, str(m)) for m in bass_line_midi_arrays}
+        for midi_dir in midi_dirs.values():
+            os.makedirs(midi_dir, exist_ok=True)
+
+        for m, bass_line_midi_array in bass_line_midi_arrays.items():
+            create_MIDI_file(bass_line_midi_array, self.BPM, self.title, midi_dirs[m])
+
+    def export_pitch_tracks(self):
+        """Exports the F0 estimate, the pitch track and the quantized pitch track to a single compressed .npz file."""
+        print('Exporting the pitch tracks.')
+        os.makedirs(self.pitch_tracks_dir, exist_ok=True)
+        np.savez_compressed(os.path.join(self.pitch_tracks_dir, self.title+'.npz'),
+                            F0_estimate=np.array(self.F0_estimate, dtype=np.float32),
+                            pitch_track=np.array(self.pitch_track, dtype=np.float32),
+                            quantized_pitch_track=np.array(self.pitch_track_quantized, dtype=np.float32))
\ No newline at end of file
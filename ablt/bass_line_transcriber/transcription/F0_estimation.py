@@ -3,9 +3,9 @@
 
 import numpy as np
 
-from librosa import pyin
 from crepe import predict as crepe_predict
 
+from .yin import pyin
 from ...utilities import create_frequency_bins
 from ...constants import FS, FRAME_LEN, F_MAX, F_MIN, HOP_RATIO
 
@@ -39,7 +39,7 @@ def pYIN_F0(audio, beat_duration, hop_ratio=HOP_RATIO, N_bars=4, threshold=0.05)
     else:
         assert threshold < 1.0 and threshold >= 0, 'Threshold must be in [0, 1)'
 
-    F0 = np.round(F0, 2) # round to 2 decimals
+    F0 = np.round(F0, 2).astype(np.float32) # round to 2 decimals, float32 halves the later passes
 
     F0 = ensure_sequence_length(F0, N_qb=N_qb, N_bars=N_bars)
 
@@ -55,7 +55,7 @@ def confidence_filter(F0, confidence, threshold):
     Silences the time instants where the model confidence is below the given threshold.
     """
 
-    return np.array([f if confidence[idx] >= threshold else 0.0 for idx, f in enumerate(F0)])
+    return np.where(confidence[:len(F0)] >= threshold, F0, 0.0).astype(F0.dtype, copy=False)
 
 
 def ensure_sequence_length(sequence, N_qb=8, N_bars=4):
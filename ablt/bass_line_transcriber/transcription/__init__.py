@@ -3,4 +3,5 @@
 
 from .F0_estimation import argmax_F0, crepe_F0, pYIN_F0, ensure_sequence_length
 from .quantization import uniform_voiced_region_quantization, adaptive_voiced_region_quantization
-from .midi_transcription import (midi_sequence_to_midi_array, frequency_to_midi_sequence, downsample_midi_sequence)
\ No newline at end of file
+from .midi_transcription import (midi_sequence_to_midi_array, midi_sequence_to_midi_arrays, frequency_to_midi_sequence,
+                                 downsample_midi_sequence)
\ No newline at end of file
@@ -7,7 +7,6 @@ import numpy as np
 
 warnings.filterwarnings('ignore') 
 
-# TODO REPLACE zeros prior for warning handling.
 def frequency_to_midi_sequence(F0, silence_code=0):
     """
     Maps a frequency array to midi numbers with silence regions indicated by the silence_code and ensures length.
@@ -19,12 +18,16 @@ def frequency_to_midi_sequence(F0, silence_code=0):
 
         Returns:
         --------
-            midi_seq (ndarray): numpy array of midi numbers, silence=silence_code
+            midi_seq (ndarray): int16 numpy array of midi numbers, silence=silence_code
     """
 
-    midi_seq = 12*np.log2(F0/440) + 69
+    F0 = np.asarray(F0)
+    voiced = F0 > 0
 
-    midi_seq = np.rint(np.nan_to_num(midi_seq, neginf=silence_code)).astype(int)
+    # silences are replaced before the log, so no division by zero happens
+    midi_numbers = np.clip(np.rint(12*np.log2(np.where(voiced, F0, 440.0)/440) + 69), 0, 127)
+
+    midi_seq = np.where(voiced, midi_numbers, silence_code).astype(np.int16)
 
     return midi_seq
 
@@ -56,14 +59,33 @@ def midi_sequence_to_midi_array(midi_seq, M, N_qb=8, silence_code=0, velocity=12
     change_indices = np.insert(change_indices, [0, len(change_indices)], [-1, len(midi_seq)-1])
     note_lengths = np.diff(change_indices) / hop_ratio  # normalize to beats
 
-    midi_array = []
-    for i, j in enumerate(change_indices[:-1]):
-        start_idx = j+1
-        note = midi_seq[start_idx]
-        if note != silence_code:  # non-zero notes only
-            midi_array.append([start_idx/hop_ratio, note, velocity, note_lengths[i]])
+    start_indices = change_indices[:-1] + 1
+    notes = midi_seq[start_indices]
+    midi_array = np.stack([start_indices/hop_ratio, notes, np.full(len(notes), velocity), note_lengths], axis=1)
+
+    return midi_array[notes != silence_code] # non-zero notes only
+
+
+def midi_sequence_to_midi_arrays(midi_seq, M, N_qb=8, silence_code=0, velocity=120):
+    """
+    Creates the midi array of each given decimation rate from a single midi sequence.
+
+        Parameters:
+        -----------
+            midi_seq (ndarray): midi number sequence
+            M (list): decimation rates between 1 and N_qb
+            N_qb (int, default=8): number of samples a quarterbeat gets
+            silence_code (int, default=0): A code int representing silences
+            velocity (int, default=120): velocity of a midi note
+
+        Returns:
+        --------
+            midi_arrays (dict): {m: midi_array} for each decimation rate m
+    """
+
+    midi_seq = np.asarray(midi_seq)
 
-    return np.array(midi_array)
+    return {m: midi_sequence_to_midi_array(midi_seq, m, N_qb, silence_code, velocity) for m in M}
 
 
 def downsample_midi_sequence(midi_seq, M,  N_qb=8):
@@ -85,7 +107,7 @@ def downsample_midi_sequence(midi_seq, M,  N_qb=8):
         N_qb)
     assert not N_qb % M, 'N_qb must be divisble by the decimation rate!'
 
-    # Downsample
-    midi_seq_decimated = midi_seq[np.arange(0, len(midi_seq), M, dtype=int)]
+    # Downsample, a strided view of midi_seq
+    midi_seq_decimated = midi_seq[::M]
 
     return midi_seq_decimated
\ No newline at end of file
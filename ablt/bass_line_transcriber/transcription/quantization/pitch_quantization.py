@@ -5,7 +5,6 @@ from collections import Counter
 
 import numpy as np
 
-from ....utilities import sample_and_hold
 from ....constants import SUB_BASS_FREQUENCIES
 
 # TODO: equal votes in majority voting
@@ -18,7 +17,7 @@ def uniform_quantization(pitch_track, segments, epsilon=2):
         -----------
 
             pitch_track (tupple): (time_axis, F0) where both are np.ndarray
-            segments(tupple): voiced region (boundaries, lengths, indices)
+            segments(tupple): voiced region (boundaries, lengths)
             epsilon (int, default=2): freq_bound = delta_scale/epsilon determines if quantization will happen.
         
         Returns:
@@ -28,19 +27,16 @@ def uniform_quantization(pitch_track, segments, epsilon=2):
 
     """
 
-    boundaries, lengths, indices = segments
+    boundaries, _ = segments
 
-    # Form the Pitch Histogram and Do Majority Voting for each region independently
-    pitch_histograms = create_pitch_histograms(pitch_track[1], boundaries, epsilon)
-    majority_pitches = get_majority_pitches(pitch_histograms)    
-
-    #Quantize Each Region
-    quantized_non_zero_frequencies = sample_and_hold(majority_pitches,  lengths)
-    assert len(indices) == len(quantized_non_zero_frequencies), 'Hold lengths do not match'
+    # Quantize the whole track in a single pass, then do majority voting for each region independently
+    quantized_F0 = quantize_frequencies(pitch_track[1], epsilon)
+    majority_pitches = get_majority_pitches([Counter(quantized_F0[start:end].tolist()) for start, end in boundaries])
 
     # replace regions with quantized versions
     quantized_pitches = pitch_track[1].copy()
-    np.put(quantized_pitches, indices, quantized_non_zero_frequencies)
+    for (start, end), f in zip(boundaries, majority_pitches):
+        quantized_pitches[start:end] = f
 
     pitch_track_quantized = (pitch_track[0], quantized_pitches) # (time, freq) 
 
@@ -78,6 +74,37 @@ def quantize_frequency(f, epsilon):
     return f 
 
 
+def quantize_frequencies(F0, epsilon):
+    """
+    Vectorized quantize_frequency. Finds the closest note of each frequency with a binary search on the sorted
+    note frequencies instead of measuring the distance to every note.
+
+    Parameters:
+    -----------
+
+        F0 (ndarray): frequency array in Hz.
+        epsilon (int): freq_bound = delta_scale/epsilon determines if quantization will happen.
+
+    Returns:
+    --------
+
+        F0_quantized (ndarray): quantized frequencies in Hz, zeros are kept
+
+    """
+
+    F0 = np.asarray(F0)
+
+    # the closest note is one of the two notes surrounding f, ties go to the lower note
+    idx = np.clip(np.searchsorted(SUB_BASS_FREQUENCIES, F0), 1, len(SUB_BASS_FREQUENCIES)-1)
+    lower, upper = SUB_BASS_FREQUENCIES[idx-1], SUB_BASS_FREQUENCIES[idx]
+    closest_notes = np.where(np.abs(F0-lower) <= np.abs(upper-F0), lower, upper)
+
+    delta_bound = np.min(np.diff(SUB_BASS_FREQUENCIES)) / epsilon
+
+    # quantize non zero frequencies that have a note closeby
+    return np.where((F0 != 0) & (np.abs(F0-closest_notes) <= delta_bound), closest_notes, F0)
+
+
 def single_pitch_histogram(F0, epsilon):
     """
     Creates a single pitch histogram for a given interval by quantizing each frequency.
@@ -95,7 +122,7 @@ def single_pitch_histogram(F0, epsilon):
 
     """
    
-    return Counter([quantize_frequency(f, epsilon) for f in F0])
+    return Counter(quantize_frequencies(F0, epsilon).tolist())
 
 
 def create_pitch_histograms(F0, boundaries, epsilon=2):  
@@ -1,8 +1,6 @@
 #!/usr/bin/env python
 # coding: utf-8
 
-import numpy as np
-
 from .pitch_quantization import quantize_frequency
 
 
@@ -68,12 +66,13 @@ def region_silencer(pitch_track, bad_regions):
     Zeroes out given regions.
     """
 
-    # get the indices to be silenced
-    _, _, indices = bad_regions
+    boundaries, _ = bad_regions
 
-    silenced_pitch_track = np.array([0.0 if idx in indices else f for idx, f in enumerate(pitch_track[1])])
+    silenced_F0 = pitch_track[1].copy()
+    for start, end in boundaries:
+        silenced_F0[start:end] = 0.0
 
-    return (pitch_track[0], silenced_pitch_track)
+    return (pitch_track[0], silenced_F0)
 
 # REMOVE!
 def unk_filter(pitch_track, track_scale):
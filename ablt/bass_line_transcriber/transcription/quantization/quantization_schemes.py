@@ -4,7 +4,7 @@
 import numpy as np
 
 from .pitch_quantization import uniform_quantization
-from .segmentation import find_voiced_regions, segment_voiced_regions, get_region_information
+from .segmentation import calcRegionBounds, find_voiced_regions, segment_voiced_regions, get_region_information
 from .post_processing import onset_offset_merger, region_silencer
 
 
@@ -50,8 +50,8 @@ def adaptive_voiced_region_quantization(pitch_track, quarter_beat_positions, len
             pitch_track_quantized (tupple): (time_axis, F0) where both are np.ndarrays
     """
 
-    # Find the voiced regions
-    voiced_boundaries, _, _ = find_voiced_regions(pitch_track[1])
+    # Find the voiced regions, only their boundaries are needed
+    voiced_boundaries = calcRegionBounds(pitch_track[1] != 0.0)
 
     # segment the voiced regions
     segmented_good_regions, okay_regions, bad_regions = segment_voiced_regions(pitch_track[0], 
@@ -59,7 +59,7 @@ def adaptive_voiced_region_quantization(pitch_track, quarter_beat_positions, len
                                                                         length_threshold,
                                                                         quarter_beat_positions)
 
-    # flatten the boundaries, and create segment tupple = (bounds, lens, indices)
+    # flatten the boundaries, and create segment tupple = (bounds, lens)
     good_regions = get_region_information(np.array([bounds for region in segmented_good_regions for bounds in region]))
 
     # Uniformly quantize each segmented region independtly 
@@ -20,7 +20,7 @@ def calcRegionBounds(bool_array):
 
 def find_voiced_regions(F0):
     """
-    From a given F0 array, finds the voiced regions' boundaries and returns them with corresponding lengths and indices.
+    From a given F0 array, finds the voiced regions' boundaries and returns them with corresponding lengths.
     """
     
     voiced_boundaries = calcRegionBounds(F0 != 0.0)
@@ -30,14 +30,14 @@ def find_voiced_regions(F0):
 
 def get_region_information(boundaries):
     """
-    Packs the boundaries, lengths, and the corresponding indices in a tupple.
+    Packs the boundaries and the lengths in a tupple.
     """
 
-    lengths = np.diff(boundaries, 1).flatten().tolist()
+    boundaries = np.reshape(boundaries, (-1, 2)).astype(int)
 
-    indices = [x for start, end in boundaries for x in np.arange(start, end)]
+    lengths = np.diff(boundaries, 1).flatten().tolist()
 
-    return (boundaries, lengths, indices)
+    return (boundaries, lengths)
 
 
 def find_closest_quarter_beat(time, quarter_beat_positions):
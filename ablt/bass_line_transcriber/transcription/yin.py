@@ -0,0 +1,409 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfft, irfft, next_fast_len
+from scipy.stats import beta
+from numba import njit, prange, stencil
+
+from librosa.sequence import transition_local
+
+
+def pyin(audio, fmin, fmax, sr=44100, frame_length=2048, win_length=None, hop_length=None,
+        n_thresholds=100, beta_parameters=(2, 18), boltzmann_parameter=2, resolution=0.1,
+        max_transition_rate=35.92, switch_prob=0.01, no_trough_prob=0.01, fill_na=np.nan, silence_threshold=1e-3):
+    """
+    Probabilistic YIN F0 estimation with centered, reflect padded frames. For the frames above the RMS gate,
+    gives the same F0 and voicing as librosa.pyin of the pinned librosa 0.8.1, silence_threshold=0 reproduces
+    librosa (see tests/test_yin.py). The audio is analyzed in float32 and the per frame stages are compiled kernels.
+
+        Parameters:
+        -----------
+            audio (ndarray): mono audio array
+            fmin, fmax (float): frequency range of interest in Hz
+            sr (int, default=44100): sampling rate
+            frame_length (int, default=2048): length of the frames in samples
+            win_length (int, default=None): autocorrelation window length, frame_length//2 if None
+            hop_length (int, default=None): hop length in samples, frame_length//4 if None
+            n_thresholds (int, default=100): number of thresholds for trough picking
+            beta_parameters (tupple, default=(2, 18)): beta distribution prior over the thresholds
+            boltzmann_parameter (float, default=2): boltzmann distribution prior over the troughs
+            resolution (float, default=0.1): pitch bin resolution in semitones
+            max_transition_rate (float, default=35.92): maximum pitch transition rate in octaves per second
+            switch_prob (float, default=0.01): probability of switching between voiced and unvoiced
+            no_trough_prob (float, default=0.01): probability added to the global minimum if no trough is
+                                                    below a threshold
+            fill_na (float, default=np.nan): value of the unvoiced frames
+            silence_threshold (float, default=1e-3): frames whose RMS is below this ratio of the loudest frame's
+                                                    are not analyzed and left unvoiced, 0 only skips the digital silence
+
+        Returns:
+        --------
+            F0 (ndarray): F0 estimate of each frame
+            voiced_flag (ndarray): boolean voicing decision of each frame
+            voiced_prob (ndarray): voicing probability of each frame
+    """
+
+    if win_length is None:
+        win_length = frame_length // 2
+    assert win_length < frame_length, 'win_length must be smaller than frame_length!'
+
+    if hop_length is None:
+        hop_length = frame_length // 4
+
+    # Center the frames, the padded copy is the only one made, [n_frames, frame_length] strided view
+    audio = np.pad(np.asarray(audio, dtype=np.float32), frame_length//2, mode='reflect')
+    frames = sliding_window_view(audio, frame_length)[::hop_length]
+    n_frames = len(frames)
+
+    # Skip the silent frames, they have no F0 candidates and can only be decoded as unvoiced
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
+    active_frames = np.flatnonzero(rms > silence_threshold*rms.max())
+    frames = frames[active_frames]
+
+    min_period = max(int(np.floor(sr/fmax)), 1)
+    max_period = min(int(np.ceil(sr/fmin)), frame_length - win_length - 1)
+
+    # Cumulative mean normalized difference function and its parabolic interpolation, [n_active_frames, n_periods]
+    acf_frames = autocorrelate(frames, win_length, max_period)
+    yin_frames = cumulative_mean_normalized_difference(frames, acf_frames, win_length, min_period, max_period,
+                                                    np.finfo(acf_frames.dtype).tiny)
+    parabolic_shifts = parabolic_interpolation(yin_frames)
+
+    # Prior over the thresholds
+    thresholds, beta_probs = threshold_prior(n_thresholds, tuple(beta_parameters))
+
+    # Troughs of each active frame and their probabilities, [n_active_frames, max_n_troughs] each, zero padded
+    candidate_period, candidate_prob = trough_candidates(yin_frames, thresholds[1:], beta_probs,
+                                                        boltzmann_parameter, no_trough_prob)
+
+    active_index, candidate_index = np.nonzero(candidate_prob)
+    yin_period = candidate_period[active_index, candidate_index]
+    frame_index = active_frames[active_index]
+
+    # F0 candidates refined by parabolic interpolation
+    period_candidates = min_period + yin_period + parabolic_shifts[active_index, yin_period]
+    f0_candidates = sr / period_candidates
+
+    n_bins_per_semitone = int(np.ceil(1.0/resolution))
+    n_pitch_bins = int(np.floor(12*n_bins_per_semitone*np.log2(fmax/fmin))) + 1
+
+    # Pitch bin of each candidate, the ones above fmax fall into the unvoiced states and are overwritten
+    bin_index = 12*n_bins_per_semitone*np.log2(f0_candidates/fmin)
+    bin_index = np.clip(np.round(bin_index), 0, n_pitch_bins).astype(int)
+
+    # Observation probabilities, [n_frames, 2*n_pitch_bins], voiced states come first
+    observation_probs = np.zeros((n_frames, 2*n_pitch_bins))
+    observation_probs[frame_index, bin_index] = candidate_prob[active_index, candidate_index]
+    voiced_prob = np.clip(np.sum(observation_probs[:, :n_pitch_bins], axis=1), 0, 1)
+    observation_probs[:, n_pitch_bins:] = (1 - voiced_prob[:, None]) / n_pitch_bins
+
+    # Transitions inside and across voicing
+    max_semitones_per_frame = round(max_transition_rate*12*hop_length/sr)
+    transition_width = max_semitones_per_frame*n_bins_per_semitone + 1
+    log_transition, log_p_init = hmm_log_probabilities(n_pitch_bins, transition_width, switch_prob)
+
+    # Decode in log space, tiny avoids log(0) as in librosa.sequence.viterbi
+    tiny = np.finfo(observation_probs.dtype).tiny
+    states = viterbi(np.log(observation_probs + tiny), log_transition, log_p_init,
+                    n_pitch_bins, transition_width//2, np.log(tiny))
+
+    # F0 of each decoded pitch bin
+    freqs = fmin * 2**(np.arange(n_pitch_bins)/(12*n_bins_per_semitone))
+    F0 = freqs[states % n_pitch_bins]
+    voiced_flag = states < n_pitch_bins
+    if fill_na is not None:
+        F0[~voiced_flag] = fill_na
+
+    return F0, voiced_flag, voiced_prob
+
+
+@lru_cache(maxsize=8)
+def threshold_prior(n_thresholds, beta_parameters):
+    """
+    Edges of the n_thresholds YIN threshold intervals and the beta prior probability of each interval.
+    """
+
+    thresholds = np.linspace(0, 1, n_thresholds+1)
+    beta_probs = np.diff(beta.cdf(thresholds, beta_parameters[0], beta_parameters[1]))
+
+    thresholds.setflags(write=False)
+    beta_probs.setflags(write=False)
+    return thresholds, beta_probs
+
+
+@lru_cache(maxsize=16)
+def hmm_log_probabilities(n_pitch_bins, transition_width, switch_prob):
+    """
+    Log transition matrix and log initial distribution of the voiced and the unvoiced pitch states.
+    The pitch moves at most transition_width bins per frame and the voicing switches with switch_prob,
+    the track starts unvoiced at any pitch.
+    """
+
+    transition = transition_local(n_pitch_bins, transition_width, window='triangle', wrap=False)
+    transition = np.block([[(1-switch_prob)*transition, switch_prob*transition],
+                           [switch_prob*transition, (1-switch_prob)*transition]])
+
+    p_init = np.zeros(2*n_pitch_bins)
+    p_init[n_pitch_bins:] = 1/n_pitch_bins
+
+    tiny = np.finfo(transition.dtype).tiny
+    log_transition, log_p_init = np.log(transition + tiny), np.log(p_init + tiny)
+
+    log_transition.setflags(write=False)
+    log_p_init.setflags(write=False)
+    return log_transition, log_p_init
+
+
+def autocorrelate(frames, win_length, max_period):
+    """
+    Autocorrelation of each frame's first win_length+1 samples with the frame, r_t[tau] for tau <= max_period.
+    Like librosa 0.8.1, the window has one more sample than the energy window of the difference function.
+    """
+
+    # any length >= frame_length avoids circular wrap-around, pick one with small prime factors
+    n_fft = next_fast_len(frames.shape[1], real=True)
+    a = rfft(frames, n_fft, axis=1, workers=-1)
+    b = rfft(frames[:, :win_length+1], n_fft, axis=1, workers=-1)
+    a *= np.conj(b)
+    return irfft(a, n_fft, axis=1, workers=-1)[:, :max_period+1]
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def cumulative_mean_normalized_difference(frames, acf_frames, win_length, min_period, max_period, tiny):
+    """
+    Cumulative mean normalized difference function (equation 8 of the YIN paper), frames in parallel.
+    The difference function is librosa 0.8.1's: d_t(tau) = e_t(0) + e_t(tau) - 2r_t(tau), where the energy
+    e_t(tau) is summed over the win_length samples after tau and r_t(tau) over win_length+1 samples.
+
+        Parameters:
+        -----------
+            frames (ndarray): [n_frames, frame_length] framed audio
+            acf_frames (ndarray): [n_frames, max_period+1] autocorrelation of each frame
+            win_length (int): integration window length of the difference function
+            min_period, max_period (int): period range in samples
+            tiny (float): smallest positive number of the dtype, avoids division by zero
+
+        Returns:
+        --------
+            yin_frames (ndarray): [n_frames, max_period-min_period+1] CMND of each frame
+    """
+
+    n_frames = frames.shape[0]
+    yin_frames = np.empty((n_frames, max_period-min_period+1), dtype=acf_frames.dtype)
+
+    for t in prange(n_frames):
+        x = frames[t]
+
+        # energy of the window (0, win_length]
+        energy_0 = 0.0
+        for j in range(1, win_length+1):
+            energy_0 += x[j]*x[j]
+
+        energy_tau = energy_0
+        cumulative_sum = 0.0
+        for tau in range(1, max_period+1):
+
+            # slide the energy window to (tau, tau+win_length]
+            energy_tau += x[tau+win_length]*x[tau+win_length] - x[tau]*x[tau]
+
+            # FFT round-off is zeroed
+            r_tau = acf_frames[t, tau] if abs(acf_frames[t, tau]) >= 1e-6 else 0.0
+            e_tau = energy_tau if abs(energy_tau) >= 1e-6 else 0.0
+            e_0 = energy_0 if abs(energy_0) >= 1e-6 else 0.0
+            difference = e_0 + e_tau - 2*r_tau
+
+            cumulative_sum += difference
+            if tau >= min_period:
+                yin_frames[t, tau-min_period] = difference / (cumulative_sum/tau + tiny)
+
+    return yin_frames
+
+
+@njit(cache=True)
+def is_trough(yin_frame, i):
+    """Local minimum test of librosa.util.localmin, the edges are compared with their only neighbour."""
+    if i == 0:
+        return yin_frame[0] < yin_frame[1]
+    if i == len(yin_frame)-1:
+        return yin_frame[i] < yin_frame[i-1]
+    return yin_frame[i] < yin_frame[i-1] and yin_frame[i] <= yin_frame[i+1]
+
+
+@njit(parallel=True, cache=True)
+def trough_candidates(yin_frames, thresholds, beta_probs, boltzmann_parameter, no_trough_prob):
+    """
+    Finds the troughs of each frame and computes their probabilities, frames in parallel. For each threshold,
+    the troughs below it get a Boltzmann prior over their order, so smaller periods are weighted more.
+    If no trough is below a threshold, its probability goes to the global minimum.
+
+        Parameters:
+        -----------
+            yin_frames (ndarray): [n_frames, n_periods] CMND of each frame
+            thresholds (ndarray): [n_thresholds] upper edges of the threshold bins
+            beta_probs (ndarray): [n_thresholds] beta prior of each threshold
+            boltzmann_parameter (float): shape parameter of the Boltzmann prior
+            no_trough_prob (float): probability given to the global minimum
+
+        Returns:
+        --------
+            candidate_period (ndarray): [n_frames, max_n_troughs] period index of each trough, int32
+            candidate_prob (ndarray): [n_frames, max_n_troughs] probability of each trough, float32,
+                                        zero after the last trough of a frame
+    """
+
+    n_frames, n_periods = yin_frames.shape
+
+    n_troughs = np.zeros(n_frames, dtype=np.int64)
+    for t in prange(n_frames):
+        for i in range(n_periods):
+            if is_trough(yin_frames[t], i):
+                n_troughs[t] += 1
+
+    max_n_troughs = 1
+    for t in range(n_frames):
+        max_n_troughs = max(max_n_troughs, n_troughs[t])
+    candidate_period = np.zeros((n_frames, max_n_troughs), dtype=np.int32)
+    candidate_prob = np.zeros((n_frames, max_n_troughs), dtype=np.float32)
+
+    # Boltzmann pmf of the k-th trough out of n is (1-e^-l) e^(-lk) / (1-e^(-ln))
+    decay = 1 - np.exp(-boltzmann_parameter)
+
+    for t in prange(n_frames):
+        if n_troughs[t] == 0:
+            continue
+        yin_frame = yin_frames[t]
+
+        n = 0
+        for i in range(n_periods):
+            if is_trough(yin_frame, i):
+                candidate_period[t, n] = i
+                n += 1
+        heights = np.empty(n, dtype=yin_frame.dtype)
+        global_min = 0
+        for k in range(n):
+            heights[k] = yin_frame[candidate_period[t, k]]
+            if heights[k] < heights[global_min]:
+                global_min = k
+
+        probs = np.zeros(n)
+        no_trough_mass = 0.0
+        for j in range(len(thresholds)):
+            n_below = 0
+            for k in range(n):
+                if heights[k] < thresholds[j]:
+                    n_below += 1
+            if not heights[global_min] < thresholds[j]:
+                no_trough_mass += beta_probs[j]
+            if n_below == 0:
+                continue
+
+            normalization = decay / (1 - np.exp(-boltzmann_parameter*n_below))
+            position = 0
+            for k in range(n):
+                if heights[k] < thresholds[j]:
+                    probs[k] += normalization*np.exp(-boltzmann_parameter*position) * beta_probs[j]
+                    position += 1
+
+        probs[global_min] += no_trough_prob*no_trough_mass
+        for k in range(n):
+            candidate_prob[t, k] = probs[k]
+
+    return candidate_period, candidate_prob
+
+
+@stencil
+def parabolic_shift(x):
+    """Vertex offset of the parabola passing through the neighbours, 0 if it is outside [-1, 1]."""
+    a = x[0, 1] + x[0, -1] - 2*x[0, 0]
+    b = (x[0, 1] - x[0, -1]) / 2
+    if np.abs(b) >= np.abs(a):
+        return 0.0
+    return -b / a
+
+
+@njit(parallel=True, cache=True)
+def parabolic_interpolation(yin_frames):
+    """Parabolic interpolation of each frame along the period axis, the edges are not shifted."""
+    return parabolic_shift(yin_frames)
+
+
+@njit(cache=True)
+def viterbi(log_prob, log_trans, log_p_init, n_bins, half_width, log_zero):
+    """
+    Viterbi decoding of the pYIN HMM, same path as librosa.sequence.viterbi. Each state can only be reached
+    from the states of the same or the other voicing whose pitch bin is at most half_width bins away.
+    The rest of the transitions have probability zero, their best candidate is found with running maxima.
+
+        Parameters:
+        -----------
+            log_prob (ndarray): [n_frames, 2*n_bins] log observation probabilities
+            log_trans (ndarray): [2*n_bins, 2*n_bins] log transition matrix
+            log_p_init (ndarray): [2*n_bins] log initial state distribution
+            n_bins (int): number of pitch bins of each voicing
+            half_width (int): number of pitch bins a transition can move
+            log_zero (float): log transition of the states outside the band
+
+        Returns:
+        --------
+            states (ndarray): most likely state sequence
+    """
+
+    n_frames, n_states = log_prob.shape
+
+    backpointers = np.zeros((n_frames, n_states), dtype=np.int32)
+    log_delta = log_prob[0] + log_p_init
+    next_log_delta = np.empty(n_states)
+
+    # maximum and its first index over the bins [0, b] (prefix) and [b, n_bins) (suffix) of each voicing
+    prefix_max, suffix_max = np.empty((2, n_bins)), np.empty((2, n_bins))
+    prefix_idx, suffix_idx = np.empty((2, n_bins), dtype=np.int32), np.empty((2, n_bins), dtype=np.int32)
+
+    for t in range(1, n_frames):
+
+        for v in range(2):
+            offset = v*n_bins
+            prefix_max[v, 0], prefix_idx[v, 0] = log_delta[offset], offset
+            for b in range(1, n_bins):
+                if log_delta[offset+b] > prefix_max[v, b-1]:
+                    prefix_max[v, b], prefix_idx[v, b] = log_delta[offset+b], offset+b
+                else:
+                    prefix_max[v, b], prefix_idx[v, b] = prefix_max[v, b-1], prefix_idx[v, b-1]
+            suffix_max[v, n_bins-1], suffix_idx[v, n_bins-1] = log_delta[offset+n_bins-1], offset+n_bins-1
+            for b in range(n_bins-2, -1, -1):
+                if log_delta[offset+b] >= suffix_max[v, b+1]:
+                    suffix_max[v, b], suffix_idx[v, b] = log_delta[offset+b], offset+b
+                else:
+                    suffix_max[v, b], suffix_idx[v, b] = suffix_max[v, b+1], suffix_idx[v, b+1]
+
+        for j in range(n_states):
+            b = j % n_bins
+            lower, upper = max(b-half_width, 0), min(b+half_width, n_bins-1)
+
+            # scan the candidates in state order so that ties go to the first state like np.argmax
+            best, best_idx = -np.inf, 0
+            for v in range(2):
+                offset = v*n_bins
+                if lower > 0 and prefix_max[v, lower-1] + log_zero > best:
+                    best, best_idx = prefix_max[v, lower-1] + log_zero, prefix_idx[v, lower-1]
+                for i in range(offset+lower, offset+upper+1):
+                    if log_delta[i] + log_trans[i, j] > best:
+                        best, best_idx = log_delta[i] + log_trans[i, j], i
+                if upper < n_bins-1 and suffix_max[v, upper+1] + log_zero > best:
+                    best, best_idx = suffix_max[v, upper+1] + log_zero, suffix_idx[v, upper+1]
+
+            backpointers[t, j] = best_idx
+            next_log_delta[j] = log_prob[t, j] + best
+
+        log_delta, next_log_delta = next_log_delta, log_delta
+
+    # Backtrack from the most likely final state
+    states = np.empty(n_frames, dtype=np.int32)
+    states[-1] = np.argmax(log_delta)
+    for t in range(n_frames-2, -1, -1):
+        states[t] = backpointers[t+1, states[t+1]]
+
+    return states
@@ -35,7 +35,7 @@ def create_datasets(df, excluded_titles, track_dicts,  M, N_qb=8, silence_code=0
         except FileNotFoundError:
             pass
         except Exception as ex:
-            print(''.join(traceback.format_exception(etype=type(ex), value=ex, tb=ex.__traceback__)))
+            print(''.join(traceback.TracebackException.from_exception(ex).format()))
     codes = np.array(codes).reshape(-1,512//M)
     df_codes = make_dataframe(codes, titles, keys, scales)
     df_codes_min = df_codes[df_codes['Scale'] == "min"]
@@ -95,7 +95,7 @@ def create_midi_sequences_dataframe(track_titles, track_dicts, directories, sile
         except FileNotFoundError:
             pass
         except Exception as ex:
-            print(''.join(traceback.format_exception(etype=type(ex), value=ex, tb=ex.__traceback__)))
+            print(''.join(traceback.TracebackException.from_exception(ex).format()))
     midi_sequences = np.array(midi_sequences).reshape(-1, 512)
     print('There are {} midi sequences.'.format(midi_sequences.shape[0]))
     df = make_dataframe(midi_sequences, valid_titles, keys, scales)
@@ -151,7 +151,7 @@ def repeat_dataset(df_titles, track_dicts, N_bars_repeat, directories, M):
             pass
             #print(segment.shape)
         except Exception as ex:
-            print(''.join(traceback.format_exception(etype=type(ex), value=ex, tb=ex.__traceback__)))
+            print(''.join(traceback.TracebackException.from_exception(ex).format()))
 
     representations = np.stack(representations, axis=0)
     bar_titles = np.stack(bar_titles, axis=0)
@@ -182,7 +182,7 @@ def count_notes(df):
         except FileNotFoundError:
             pass
         except Exception as ex:
-            print(''.join(traceback.format_exception(etype=type(ex), value=ex, tb=ex.__traceback__)))
+            print(''.join(traceback.TracebackException.from_exception(ex).format()))
     note_counter = dict(sorted(note_counter.items(), key=lambda x: x[0]))
     return note_counter
 
@@ -201,7 +201,7 @@ def count_notes_with_transposing(df):
         except FileNotFoundError:
             pass
         except Exception as ex:
-            print(''.join(traceback.format_exception(etype=type(ex), value=ex, tb=ex.__traceback__)))
+            print(''.join(traceback.TracebackException.from_exception(ex).format()))
     del note_counter[0]
     del note_counter_T[0]
     note_counter = dict(sorted(note_counter.items(), key=lambda x: x[0]))
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+from functools import lru_cache
+
 import numpy as np
 
 from librosa import stft, amplitude_to_db
@@ -40,11 +42,7 @@ def lp_and_normalize(track, fc, fs, M=5001, window_type='blackman'):
             track_cut (ndarray): processed track
     """
 
-    # Type I filter
-    lp = firwin(M,
-                cutoff=fc,
-                window=window_type,
-                fs=fs) 
+    lp = lowpass_filter(M, fc, fs, window_type)
 
     track_cut = convolve(track, lp, mode='same') # same length convolution
 
@@ -53,3 +51,16 @@ def lp_and_normalize(track, fc, fs, M=5001, window_type='blackman'):
     return track_cut
 
 
+@lru_cache(maxsize=8)
+def lowpass_filter(M, fc, fs, window_type='blackman'):
+    """
+    Designs a Type I low pass filter. The taps only depend on the parameters, so they are designed once
+    and shared (read-only) between the calls.
+    """
+
+    lp = firwin(M,
+                cutoff=fc,
+                window=window_type,
+                fs=fs)
+    lp.flags.writeable = False
+    return lp
@@ -6,11 +6,10 @@ import json
 import time
 import psutil
 import traceback
+from functools import lru_cache
 
 import numpy as np
 
-from demucs.pretrained import load_pretrained
-
 #-------------------------------------------------- METADATA ------------------------------------------------------------
 
 def read_track_dicts(path):
@@ -39,27 +38,60 @@ def get_bar_positions(beat_positions):
     return np.array([val for idx,val in enumerate(beat_positions) if not idx%4])
 
 def get_quarter_beat_positions(beat_positions):
-    quarter_beats = []
-    for i in range(len(beat_positions)-1):
-        for qb in np.linspace(beat_positions[i],beat_positions[i+1], 4, endpoint=False):
-            quarter_beats.append(qb)
-            
-    return np.array(quarter_beats)
+    """Divides each beat into 4 equal parts, the last beat position is not included."""
+    return subdivide_beat_positions(beat_positions, 4)
 
 def get_eighth_beat_positions(beat_positions):
-    eighth_beats = []
-    for i in range(len(beat_positions)-1):
-        for qb in np.linspace(beat_positions[i],beat_positions[i+1], 8, endpoint=False):
-            eighth_beats.append(qb)
-            
-    return eighth_beats
+    """Divides each beat into 8 equal parts, the last beat position is not included."""
+    return subdivide_beat_positions(beat_positions, 8)
+
+def subdivide_beat_positions(beat_positions, N):
+    """
+    Divides each beat into N equal parts by broadcasting, same values as
+    np.linspace(beat_positions[i], beat_positions[i+1], N, endpoint=False) for each beat.
+    """
+    beat_positions = np.asarray(beat_positions, dtype=float)
+    steps = np.diff(beat_positions) / N
+    return (np.arange(N) * steps[:, None] + beat_positions[:-1, None]).ravel()
+
+# Load Beat Tracking Model
+
+@lru_cache(maxsize=1)
+def load_beat_tracking_processor():
+    """
+    Loads the madmom beat tracker once per process. RNNBeatProcessor reads its networks from disk on creation.
+    """
+    from madmom.features.beats import RNNBeatProcessor, BeatTrackingProcessor
+    from madmom.processors import SequentialProcessor
+    return SequentialProcessor([RNNBeatProcessor(), BeatTrackingProcessor(fps=100)])
 
 # Load Source Separation Model
 
+@lru_cache(maxsize=1)
 def load_source_separation_model():
+    """
+    Loads demucs_extra once per process in evaluation mode. demucs and torch are only imported here,
+    so that the transcription does not load them.
+    """
+    from demucs.pretrained import load_pretrained
     separator = load_pretrained('demucs_extra')
+    separator.eval()
     return separator
 
+def compile_source_separation_model(separator):
+    """
+    Compiles the separator with torch.compile to cut the python overhead of its layers in the batched forward
+    passes, on the GPU CUDA graphs are used as well. The first batch of each input shape pays the compilation.
+    Returns the separator as it is if torch.compile is not available (torch < 2.0).
+    """
+    import torch
+    if not hasattr(torch, 'compile'):
+        print('torch.compile is not available, the separator is not compiled.')
+        return separator
+    if torch.cuda.is_available():
+        return torch.compile(separator.to('cuda'), mode='reduce-overhead')
+    return torch.compile(separator)
+
 #-------------------------------------------------- Miscallenous ------------------------------------------------------------
 
 def sample_and_hold(samples, N_samples):
@@ -85,7 +117,7 @@ def batch_export_function(batch_dict, path):
 def exception_logger(dir, ex, title):
     date = time.strftime("%m-%d_%H-%M-%S")
     os.makedirs(dir, exist_ok=True)
-    exception_str = ''.join(traceback.format_exception(etype=type(ex), value=ex, tb=ex.__traceback__))
+    exception_str = ''.join(traceback.TracebackException.from_exception(ex).format())
     exception_dir = os.path.join(dir, '{}_{}.txt'.format(date, type(ex).__name__))
     with open(exception_dir, 'a') as outfile:
         outfile.write(title+'\n'+exception_str+'\n'+'--'*40+'\n')
@@ -1,4 +1,4 @@
-import os
+import os, sys
 import argparse
 
 import numpy as np
@@ -36,21 +36,24 @@ if __name__ == "__main__":
 
         title = os.path.splitext(os.path.basename(audio_dir))[0]
 
-        if track_dicts is None:
+        if track_dicts is None or title not in track_dicts:
             BPM = 0
         else:
             BPM = track_dicts[title]['BPM']
         
-        extract_single_bass_line(audio_dir, N_bars=N_bars, separator=None, BPM=BPM)
+        chorus_beat_positions = extract_single_bass_line(audio_dir, N_bars=N_bars, separator=None, BPM=BPM)
+        if chorus_beat_positions is None: # extraction failed, it is logged
+            sys.exit()
 
         # Update with the estimated BPM
-        if track_dicts is None:
+        if BPM == 0:
             BPM_path = os.path.join(OUTPUT_DIR, title, 'beat_grid', 'BPM.npy')
             BPM = np.load(BPM_path)        
         
         bassline_path = os.path.join(OUTPUT_DIR, title, 'bass_line', title+'.npy')
         transcribe_single_bass_line(bassline_path, BPM=BPM, M=M,
-                                    N_bars=N_bars, hop_ratio=hop_ratio)
+                                    N_bars=N_bars, hop_ratio=hop_ratio,
+                                    chorus_beat_positions=chorus_beat_positions)
 
     else: # if a folder of audio files is specified
 
@@ -59,19 +62,22 @@ if __name__ == "__main__":
 
             title = os.path.splitext(title_ext)[0]
 
-            if track_dicts is None:
+            if track_dicts is None or title not in track_dicts:
                 BPM = 0
             else:
                 BPM = track_dicts[title]['BPM']
 
             audio_path = os.path.join(audio_dir, title_ext)
-            extract_single_bass_line(audio_path, N_bars=N_bars, separator=None, BPM=BPM)
+            chorus_beat_positions = extract_single_bass_line(audio_path, N_bars=N_bars, separator=None, BPM=BPM)
+            if chorus_beat_positions is None: # extraction failed, it is logged
+                continue
 
             # Update with the estimated BPM
-            if track_dicts is None:
+            if BPM == 0:
                 BPM_path = os.path.join(OUTPUT_DIR, title, 'beat_grid', 'BPM.npy')
                 BPM = np.load(BPM_path)       
             
             bassline_path = os.path.join(OUTPUT_DIR, title, 'bass_line', title+'.npy')
             transcribe_single_bass_line(bassline_path, BPM=BPM, M=M, 
-                                        N_bars=N_bars, hop_ratio=hop_ratio)
\ No newline at end of file
+                                        N_bars=N_bars, hop_ratio=hop_ratio,
+                                        chorus_beat_positions=chorus_beat_positions)
\ No newline at end of file
@@ -18,6 +18,10 @@ for file in "data/outputs/*/"; do
     delete_string="$file$string"
     rm -rf $delete_string  
 
+    string="/pitch_tracks"
+    delete_string="$file$string"
+    rm -rf $delete_string
+
     string="/exceptions/transciption"
     delete_string="$file$string"
     rm -rf $delete_string       
@@ -2,10 +2,8 @@ import os
 import argparse
 import tqdm
 
-from demucs.pretrained import load_pretrained
-
-from ablt.utilities import read_track_dicts
-from ablt.bass_line_extractor import extract_single_bass_line
+from ablt.utilities import read_track_dicts, load_source_separation_model
+from ablt.bass_line_extractor import extract_single_bass_line, extract_bass_lines, extract_bass_lines_batched
 
 from ablt.directories import AUDIO_DIR, TRACK_DICTS_PATH
 
@@ -18,6 +16,13 @@ if __name__ == '__main__':
     parser.add_argument('-a', '--audio-dir', type=str, help="Directory containing all the audio files.", default=AUDIO_DIR)
     parser.add_argument('-n', '--n-bars', type=int, help="Number of chorus bars to extract.", default=4)
     parser.add_argument('-t', '--track-dicts', action="store_true", help="Use a track_dicts.json file.")
+    parallelism = parser.add_mutually_exclusive_group()
+    parallelism.add_argument('-w', '--workers', type=int, help="Number of tracks to process in parallel, 0 for min(4, cpu count). "
+                                                                 "Each worker loads its own demucs model, memory grows with the workers.", default=1)
+    parallelism.add_argument('-b', '--batch-size', type=int, help="Number of tracks whose choruses are separated together "
+                                                                     "in a single process, 1 for separating them one by one.", default=1)
+    parser.add_argument('-c', '--compile', action="store_true", help="Compile demucs with torch.compile (torch >= 2.0) "
+                                                                    "for the batched separation, used with --batch-size.")
     args = parser.parse_args()
 
     audio_dir = args.audio_dir
@@ -31,29 +36,36 @@ if __name__ == '__main__':
     
     if os.path.isfile(audio_dir): # if a single file is specified
 
-        if track_dicts is None:
+        title = os.path.splitext(os.path.basename(audio_dir))[0]
+        if track_dicts is None or title not in track_dicts:
             BPM = 0
         else:
-            title = os.path.splitext(os.path.basename(audio_dir))[0]
             BPM = track_dicts[title]['BPM']         
 
         extract_single_bass_line(audio_dir, N_bars=N_bars, separator=None, BPM=BPM) 
 
     else: # if a directory of audio files is specified
 
-        # Load the demucs once here for faster training
-        separator = load_pretrained('demucs_extra')       
-
         # Get the list of all wav and mp3 paths
         track_titles = os.listdir(audio_dir)
-        for title_ext in tqdm.tqdm(track_titles):
+        audio_paths = [os.path.join(audio_dir, title_ext) for title_ext in track_titles]
+
+        if track_dicts is None:
+            BPMs = [0]*len(track_titles)
+        else: # the BPM is estimated for the tracks missing in the track_dicts
+            BPMs = [track_dicts.get(os.path.splitext(title_ext)[0], {}).get('BPM', 0) for title_ext in track_titles]
+
+        if args.batch_size > 1:
+            extract_bass_lines_batched(audio_paths, BPMs, N_bars=N_bars, batch_size=args.batch_size,
+                                        compile_model=args.compile)
+
+        elif args.workers == 1:
 
-            audio_path = os.path.join(audio_dir, title_ext)
+            # Load the demucs once here for faster training
+            separator = load_source_separation_model()
 
-            if track_dicts is None:
-                BPM = 0
-            else:
-                title = os.path.splitext(title_ext)[0]
-                BPM = track_dicts[title]['BPM']
+            for audio_path, BPM in tqdm.tqdm(zip(audio_paths, BPMs), total=len(audio_paths)):
+                extract_single_bass_line(audio_path, N_bars=N_bars, separator=separator, BPM=BPM)
 
-            extract_single_bass_line(audio_path, N_bars=N_bars, separator=separator, BPM=BPM) 
\ No newline at end of file
+        else: # each worker process loads its own demucs
+            extract_bass_lines(audio_paths, BPMs, N_bars=N_bars, max_workers=args.workers or None)
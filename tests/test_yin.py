@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+import pytest
+import librosa
+from scipy.stats import boltzmann
+
+from ablt.bass_line_transcriber.transcription.yin import pyin, threshold_prior, trough_candidates, viterbi
+from ablt.constants import FS, FRAME_LEN, F_MIN, F_MAX
+
+HOP_LENGTH = int((60/125/32)*FS) # 125 BPM, HOP_RATIO=32
+
+# The port reproduces the pinned librosa version, later versions changed the difference function
+librosa_081 = pytest.mark.skipif(not librosa.__version__.startswith('0.8.'),
+                                reason='pyin parity is defined against librosa 0.8.x')
+
+
+def synthetic_bass_line(seed, noise, duration=7.5):
+    """16 sub-bass notes with their octave, about a third of them silent, over white noise."""
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration*FS)) / FS
+    bass_line = np.zeros_like(t)
+
+    notes = 440 * 2**((rng.integers(28, 46, 16) - 69) / 12)
+    note_length = len(t) // 16
+    for k, f in enumerate(notes):
+        if rng.random() < 0.3:
+            continue
+        note = slice(k*note_length, (k+1)*note_length - note_length//4)
+        bass_line[note] = np.sin(2*np.pi*f*t[note]) + 0.3*np.sin(4*np.pi*f*t[note])
+
+    return bass_line + noise*rng.standard_normal(len(t))
+
+
+def quiet_tail_bass_line(level=1e-4):
+    """A second of a full scale 55 Hz sine followed by a second of it at level, -80 dB by default."""
+
+    t = np.arange(2*FS) / FS
+    bass_line = np.sin(2*np.pi*55*t)
+    bass_line[FS:] *= level
+
+    return bass_line
+
+
+def tail_frames(n_frames):
+    """Frames that lie entirely inside the quiet tail, the reflect padded ends excluded."""
+    starts = np.arange(n_frames)*HOP_LENGTH - FRAME_LEN//2
+    return (starts >= FS) & (starts + FRAME_LEN <= 2*FS)
+
+
+@librosa_081
+@pytest.mark.parametrize('noise', [1e-3, 5e-2, 2e-1])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_pyin_matches_librosa(seed, noise):
+
+    bass_line = synthetic_bass_line(seed, noise)
+
+    F0, voiced_flag, voiced_prob = pyin(bass_line, F_MIN, F_MAX, sr=FS, frame_length=FRAME_LEN,
+                                        hop_length=HOP_LENGTH, fill_na=0.0)
+    F0_ref, voiced_flag_ref, voiced_prob_ref = librosa.pyin(bass_line, fmin=F_MIN, fmax=F_MAX, sr=FS,
+                                                            frame_length=FRAME_LEN, hop_length=HOP_LENGTH,
+                                                            fill_na=0.0)
+
+    np.testing.assert_array_equal(voiced_flag, voiced_flag_ref)
+    np.testing.assert_array_equal(F0, F0_ref)
+    # rounding can rarely make a trough tie differently
+    np.testing.assert_allclose(voiced_prob, voiced_prob_ref, atol=2e-2)
+
+
+def test_pyin_gates_quiet_frames():
+
+    bass_line = quiet_tail_bass_line()
+
+    _, voiced_flag, voiced_prob = pyin(bass_line, F_MIN, F_MAX, sr=FS, frame_length=FRAME_LEN,
+                                        hop_length=HOP_LENGTH)
+    tail = tail_frames(len(voiced_flag))
+    assert voiced_flag[~tail].any()
+    assert not voiced_flag[tail].any()
+    assert not voiced_prob[tail].any()
+
+    # without the gate the tail is as periodic as the rest
+    _, voiced_flag, _ = pyin(bass_line, F_MIN, F_MAX, sr=FS, frame_length=FRAME_LEN, hop_length=HOP_LENGTH,
+                            silence_threshold=0)
+    assert voiced_flag[tail].all()
+
+
+@librosa_081
+def test_pyin_without_gate_matches_librosa():
+
+    bass_line = quiet_tail_bass_line()
+
+    F0, voiced_flag, voiced_prob = pyin(bass_line, F_MIN, F_MAX, sr=FS, frame_length=FRAME_LEN,
+                                        hop_length=HOP_LENGTH, fill_na=0.0, silence_threshold=0)
+    F0_ref, voiced_flag_ref, voiced_prob_ref = librosa.pyin(bass_line, fmin=F_MIN, fmax=F_MAX, sr=FS,
+                                                            frame_length=FRAME_LEN, hop_length=HOP_LENGTH,
+                                                            fill_na=0.0)
+
+    np.testing.assert_array_equal(voiced_flag, voiced_flag_ref)
+    np.testing.assert_array_equal(F0, F0_ref)
+    np.testing.assert_allclose(voiced_prob, voiced_prob_ref, atol=2e-2)
+
+
+def banded_problem(seed, n_bins=24, transition_width=7, n_frames=60, switch_prob=0.01):
+    """Voiced and unvoiced pitch states with pyin's banded transitions, the observations and the initial
+    distribution take few distinct values so that the paths tie often."""
+
+    rng = np.random.default_rng(seed)
+
+    transition = librosa.sequence.transition_local(n_bins, transition_width, window='triangle', wrap=False)
+    transition = np.block([[(1-switch_prob)*transition, switch_prob*transition],
+                           [switch_prob*transition, (1-switch_prob)*transition]])
+
+    prob = rng.choice([0.0, 0.0, 0.25, 0.5], size=(n_frames, 2*n_bins))
+    p_init = rng.choice([0.0, 1.0], size=2*n_bins)
+    p_init[0] = 1.0
+    p_init /= p_init.sum()
+
+    return prob, transition, p_init
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_viterbi_matches_librosa(seed):
+
+    n_bins, transition_width = 24, 7
+    prob, transition, p_init = banded_problem(seed, n_bins, transition_width)
+
+    tiny = np.finfo(prob.dtype).tiny
+    states = viterbi(np.log(prob + tiny), np.log(transition + tiny), np.log(p_init + tiny),
+                    n_bins, transition_width//2, np.log(tiny))
+    states_ref = librosa.sequence.viterbi(prob.T, transition, p_init=p_init)
+
+    np.testing.assert_array_equal(states, states_ref)
+
+
+def trough_candidates_reference(yin_frame, thresholds, beta_probs, boltzmann_parameter, no_trough_prob):
+    """Troughs of a single frame and their probabilities, computed as librosa.pyin does."""
+
+    is_trough = np.zeros(len(yin_frame), dtype=bool)
+    is_trough[0] = yin_frame[0] < yin_frame[1]
+    is_trough[1:-1] = (yin_frame[1:-1] < yin_frame[:-2]) & (yin_frame[1:-1] <= yin_frame[2:])
+    is_trough[-1] = yin_frame[-1] < yin_frame[-2]
+    trough_index = np.flatnonzero(is_trough)
+    if len(trough_index) == 0:
+        return trough_index, np.zeros(0)
+
+    trough_heights = yin_frame[trough_index]
+    trough_thresholds = trough_heights[:, None] < thresholds[None, :]
+    trough_positions = np.cumsum(trough_thresholds, axis=0) - 1
+    n_troughs = np.count_nonzero(trough_thresholds, axis=0)
+
+    trough_prior = boltzmann.pmf(trough_positions, boltzmann_parameter, n_troughs)
+    trough_prior[~trough_thresholds] = 0
+    probs = trough_prior.dot(beta_probs)
+
+    global_min = np.argmin(trough_heights)
+    n_thresholds_below_min = np.count_nonzero(~trough_thresholds[global_min])
+    probs[global_min] += no_trough_prob * np.sum(beta_probs[:n_thresholds_below_min])
+
+    return trough_index, probs
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_trough_candidates_match_reference(seed):
+
+    rng = np.random.default_rng(seed)
+    # rounding makes plateaus, the last frame is flat and has no trough
+    yin_frames = np.round(1.2*rng.random((32, 80)), 1).astype(np.float32)
+    yin_frames[-1] = 0.5
+
+    thresholds, beta_probs = threshold_prior(100, (2, 18))
+    candidate_period, candidate_prob = trough_candidates(yin_frames, thresholds[1:], beta_probs, 2, 0.01)
+
+    for t, yin_frame in enumerate(yin_frames):
+        trough_index, probs = trough_candidates_reference(yin_frame, thresholds[1:], beta_probs, 2, 0.01)
+        n = len(trough_index)
+        np.testing.assert_array_equal(candidate_period[t, :n], trough_index)
+        np.testing.assert_allclose(candidate_prob[t, :n], probs, rtol=1e-5, atol=1e-8)
+        assert not candidate_prob[t, n:].any()